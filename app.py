@@ -1,134 +1,71 @@
+import io
+from typing import Any, Dict, Optional, Tuple
 import streamlit as st
-from src.pipelines.app_service import AppService
-
-service = AppService()
-
-st.set_page_config(layout="wide", page_title="Smart Catalog Assistant")
-
-# ---------- Global CSS ----------
-st.markdown("""
-<style>
-body, .main, .stApp {
-    background-color: #050b16;
-    color: #e0e6f0;
-}
-.block-container {
-    padding-top: 2.8rem;
-    padding-bottom: 1.5rem;
-}
+from src.config.paths import STYLES_PATH
+from src.models.product import Product
+from src.pipelines.app_service import AppService, NO_BRAND_PREFERENCE
+
+@st.cache_resource
+def get_service() -> AppService:
+    return AppService()
+
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    with open(STYLES_PATH, "r", encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+@st.cache_data(show_spinner=False, ttl=600)
+def get_results(
+    product_name: str,
+    max_price: Optional[float],
+    required_tags: Tuple[str, ...],
+    preferred_brand: Optional[str],
+) -> Dict[str, Any]:
+    return get_service().get_results(product_name, max_price, list(required_tags), preferred_brand)
+
+# Products are immutable and unique by id, so hash them by id rather than by
+# every field.
+@st.cache_data(show_spinner=False, ttl=3600, hash_funcs={Product: lambda p: p.product_id})
+def get_reasoning_png(requested: Product, alternatives: Tuple[Product, ...]) -> Optional[bytes]:
+    # Cached as PNG bytes, which are much smaller than a pickled Figure.
+    fig = get_service().build_visualization(requested, alternatives)
+    if fig is None:
+        return None
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=110, bbox_inches="tight")
+    return buf.getvalue()
+
+# ---------- Product card HTML ----------
+CARD_TPL = (
+    '<div class="product-card">'
+    '<div class="product-title">{name}</div>'
+    '<div class="product-meta">{badges}</div>'
+    '<div class="product-price">₹{price}</div>'
+    '<div class="product-meta">Brand: {brand}</div>'
+    '{extra}'
+    '</div>'
+)
+IN_STOCK_BADGE = "<span class='badge badge-stock'>In stock</span>"
+OUT_OF_STOCK_BADGE = "<span class='badge badge-stock' style='opacity:0.6'>Out of stock</span>"
 
-/* Hero area */
-.hero-title {
-    font-size: 30px;
-    font-weight: 800;
-    background: linear-gradient(90deg, #5ab0ff, #9f7bff);
-    -webkit-background-clip: text;
-    color: transparent;
-}
-.hero-subtitle {
-    font-size: 14px;
-    color: #9ca7c6;
-}
+def category_badge(p: Product) -> str:
+    return f'<span class="badge badge-category">{p.category}</span>'
 
-/* Product cards */
-.product-card {
-    border: 1px solid #1f2a3a;
-    border-radius: 14px;
-    padding: 14px 16px;
-    margin-bottom: 12px;
-    background: radial-gradient(circle at top left, #1a2740 0%, #050b16 55%);
-    box-shadow: 0 4px 10px rgba(0,0,0,0.7);
-    transition: transform 0.15s ease, box-shadow 0.15s ease, border-color 0.15s ease;
-}
-.product-card:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 6px 16px rgba(0,0,0,0.9);
-    border-color: #4f82ff;
-}
-.product-title {
-    font-weight: 700;
-    font-size: 17px;
-    margin-bottom: 4px;
-    color: #ffffff;
-}
-.product-price {
-    font-size: 15px;
-    font-weight: 600;
-    color: #4fe3c1;
-}
-.product-meta {
-    font-size: 13px;
-    color: #d0d6e0;
-}
+def stock_badge(p: Product) -> str:
+    return IN_STOCK_BADGE if p.in_stock else OUT_OF_STOCK_BADGE
 
-/* Badges */
-.badge {
-    display: inline-block;
-    padding: 2px 8px;
-    border-radius: 999px;
-    font-size: 11px;
-    font-weight: 600;
-    margin-right: 6px;
-}
-.badge-category {
-    background: rgba(93, 156, 255, 0.16);
-    color: #78aaff;
-    border: 1px solid rgba(93, 156, 255, 0.4);
-}
-.badge-stock {
-    background: rgba(69, 214, 154, 0.16);
-    color: #45d69a;
-    border: 1px solid rgba(69, 214, 154, 0.4);
-}
-.badge-alt-index {
-    background: rgba(255, 200, 97, 0.16);
-    color: #ffc861;
-    border: 1px solid rgba(255, 200, 97, 0.4);
-}
+def why_suggested(explanation: str) -> str:
+    return f'<div class="product-meta"><b>Why suggested:</b> {explanation}</div>'
 
-/* Tabs */
-.stTabs [data-baseweb="tab-list"] {
-    gap: 0.3rem;
-}
-.stTabs [data-baseweb="tab"] {
-    background-color: #081321;
-    padding: 0.4rem 0.9rem;
-    border-radius: 999px;
-    color: #c0c6dd;
-    font-size: 13px;
-    font-weight: 500;
-}
-.stTabs [aria-selected="true"] {
-    background: linear-gradient(90deg, #1b3b6f, #3560b3);
-    color: #ffffff !important;
-}
+def render_card(p: Product, badges_html: str, extra: str = "") -> str:
+    return CARD_TPL.format(name=p.name, badges=badges_html, price=p.price, brand=p.brand, extra=extra)
 
-/* Buttons */
-.stButton button {
-    background: linear-gradient(90deg, #1b3b6f, #274a8a);
-    color: #ffffff;
-    border-radius: 999px;
-    border: 1px solid #3b6ac9;
-    padding: 0.4rem 1.2rem;
-}
-.stButton button:hover {
-    background: linear-gradient(90deg, #274a8a, #3560b3);
-    border-color: #4f82ff;
-}
+st.set_page_config(layout="wide", page_title="Smart Catalog Assistant")
 
-/* Expander */
-.stExpander {
-    border: 1px solid #1f2a3a;
-    border-radius: 8px;
-    background-color: #081321;
-}
+service = get_service()
 
-/* Sidebar */
-section[data-testid="stSidebar"] {
-    background-color: #050b16;
-}
-</style>
-""", unsafe_allow_html=True)
+# ---------- Global CSS ----------
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # ---------- Hero header ----------
 st.markdown('<div class="hero-title">Smart Catalog & Substitution Assistant</div>', unsafe_allow_html=True)
@@ -147,37 +84,36 @@ with left_col:
     st.subheader("Choose product")
 
     # Primary: category + product
-    categories = service.list_categories()
-    cat = st.selectbox("Category", categories, key="category_main")
+    cat = st.selectbox("Category", service.categories, key="category_main")
     product_names = service.list_products_in_category(cat)
     selected_name = st.selectbox("Product", product_names, key="product_main")
 
-    st.write("")
-    search_clicked = st.button("✨ Check stock & alternatives")
+    # Category and product stay outside the form so the product list follows
+    # the category; the filters only take effect (and rerun) on submit.
+    with st.form("filters", border=False):
+        st.markdown("**Filters (optional)**")
 
-    st.markdown("---")
-    st.markdown("**Filters (optional)**")
+        max_price_input = st.slider("Max Price (₹)", 0, 250, 0, 5, key="max_price_main")
+        max_price_val = max_price_input if max_price_input > 0 else None
 
-    max_price_input = st.slider("Max Price (₹)", 0, 250, 0, 5, key="max_price_main")
-    max_price_val = max_price_input if max_price_input > 0 else None
+        required_tags = st.multiselect("Required Tags", options=service.all_tags, default=[], key="tags_main")
 
-    all_tags = sorted({tag for p in service.products for tag in p.tags})
-    required_tags = st.multiselect("Required Tags", options=all_tags, default=[], key="tags_main")
+        preferred_brand = st.selectbox(
+            "Preferred Brand",
+            service.brand_options,
+            key="brand_main",
+        )
+        preferred_brand_val = None if preferred_brand == NO_BRAND_PREFERENCE else preferred_brand
 
-    brands = sorted({p.brand for p in service.products})
-    preferred_brand = st.selectbox(
-        "Preferred Brand",
-        ["(no preference)"] + brands,
-        key="brand_main",
-    )
-    preferred_brand_val = None if preferred_brand == "(no preference)" else preferred_brand
+        st.write("")
+        search_clicked = st.form_submit_button("✨ Check stock & alternatives")
 
 with right_col:
     tab_main, tab_graph = st.tabs(["Product & alternatives", "Reasoning graph"])
 
     if search_clicked:
-        result = service.get_results(
-            selected_name, max_price_val, required_tags, preferred_brand_val
+        result = get_results(
+            selected_name, max_price_val, tuple(required_tags), preferred_brand_val
         )
         requested = result["requested"]
 
@@ -187,23 +123,8 @@ with right_col:
 
             # Requested product card
             if requested:
-                stock_badge = (
-                    "<span class='badge badge-stock'>In stock</span>"
-                    if requested.in_stock
-                    else "<span class='badge badge-stock' style='opacity:0.6'>Out of stock</span>"
-                )
                 st.markdown(
-                    f"""
-                    <div class="product-card">
-                        <div class="product-title">{requested.name}</div>
-                        <div class="product-meta">
-                            <span class="badge badge-category">{requested.category}</span>
-                            {stock_badge}
-                        </div>
-                        <div class="product-price">₹{requested.price}</div>
-                        <div class="product-meta">Brand: {requested.brand}</div>
-                    </div>
-                    """,
+                    render_card(requested, " ".join([category_badge(requested), stock_badge(requested)])),
                     unsafe_allow_html=True,
                 )
 
@@ -214,60 +135,41 @@ with right_col:
             # If exact match is available and also passes filters
             if result["exact_match"]:
                 em = result["exact_match"]["product"]
-                st.markdown("**You can buy this exact item:**")
-                st.markdown(
-                    f"""
-                    <div class="product-card">
-                        <div class="product-title">{em.name}</div>
-                        <div class="product-meta">
-                            <span class="badge badge-category">{em.category}</span>
-                            <span class="badge badge-stock">In stock</span>
-                        </div>
-                        <div class="product-price">₹{em.price}</div>
-                        <div class="product-meta">Brand: {em.brand}</div>
-                        <div class="product-meta"><b>Why suggested:</b> {result["exact_match"]["explanation"]}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
+                card = render_card(
+                    em,
+                    " ".join([category_badge(em), IN_STOCK_BADGE]),
+                    why_suggested(result["exact_match"]["explanation"]),
                 )
+                st.markdown("**You can buy this exact item:**\n\n" + card, unsafe_allow_html=True)
 
             # Alternatives, always shown under the product section
             st.markdown("### Recommended alternatives")
             if result["alternatives"]:
-                for idx, rec in enumerate(result["alternatives"], start=1):
-                    p = rec.product
-                    alt_stock_badge = (
-                        "<span class='badge badge-stock'>In stock</span>"
-                        if p.in_stock
-                        else "<span class='badge badge-stock' style='opacity:0.6'>Out of stock</span>"
-                    )
-                    st.markdown(
-                        f"""
-                        <div class="product-card">
-                            <div class="product-title">{p.name}</div>
-                            <div class="product-meta">
-                                <span class="badge badge-alt-index">Alt #{idx}</span>
-                                <span class="badge badge-category">{p.category}</span>
-                                {alt_stock_badge}
-                            </div>
-                            <div class="product-price">₹{p.price}</div>
-                            <div class="product-meta">
-                                Brand: {p.brand}
-                            </div>
-                            <div class="product-meta"><b>Why suggested:</b> {rec.explanation}</div>
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
+                # One markdown element for all cards instead of one per alternative.
+                cards = [
+                    render_card(
+                        rec.product,
+                        " ".join([
+                            f'<span class="badge badge-alt-index">Alt #{idx}</span>',
+                            category_badge(rec.product),
+                            stock_badge(rec.product),
+                        ]),
+                        why_suggested(rec.explanation),
                     )
+                    for idx, rec in enumerate(result["alternatives"], start=1)
+                ]
+                st.markdown("\n".join(cards), unsafe_allow_html=True)
             else:
                 st.write("No alternative suggestions with the current filters.")
 
         with tab_graph:
             st.subheader("Knowledge Graph reasoning")
             if result["requested"] and result["alternatives"]:
-                fig = service.build_visualization(result["requested"], result["alternatives"])
-                if fig:
-                    st.pyplot(fig)
+                png = get_reasoning_png(
+                    result["requested"], tuple(rec.product for rec in result["alternatives"])
+                )
+                if png:
+                    st.image(png)
             else:
                 st.write("No paths to visualize (no alternatives for this query).")
     else:
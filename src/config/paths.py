@@ -10,5 +10,14 @@ PROJECT_ROOT = os.path.dirname(SRC_DIR)                      # .../Shopkeeper Pr
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 
 PRODUCTS_PATH = os.path.join(DATA_DIR, "products.json")
+# Optional NDJSON form of the catalog; streamed when products.json is absent.
+PRODUCTS_NDJSON_PATH = os.path.join(DATA_DIR, "products.ndjson")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
 ATTRIBUTES_PATH = os.path.join(DATA_DIR, "attributes.json")
+
+# Derived, rebuildable files (e.g. the pickled products snapshot); safe to delete.
+CACHE_DIR = os.environ.get("SHOPKEEPER_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
+
+ASSETS_DIR = os.path.join(PROJECT_ROOT, "assets")
+
+STYLES_PATH = os.path.join(ASSETS_DIR, "styles.css")
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import List, Dict, Optional, Iterable
+import networkx as nx
+import numpy as np
+
+from src.models.product import Product
+from src.core.kg_builder import CATEGORIES, SIMILAR_CATEGORIES, CompiledKG, build_kg, compile_kg
+
+@dataclass
+class Catalog:
+    """Product lookups, column arrays and the KG, built once per product list."""
+
+    products: List[Product]
+    id_to_product: Dict[str, Product]
+    name_to_product_id: Dict[str, str]
+    row_of: Dict[str, int]
+    prices: np.ndarray
+    in_stock: np.ndarray
+    category_index: Dict[str, int]
+    category_codes: np.ndarray
+    category_closeness: np.ndarray
+    brand_index: Dict[str, int]
+    brand_codes: np.ndarray
+    tag_index: Dict[str, int]
+    tag_masks: np.ndarray
+    KG: nx.Graph
+    compiled_kg: CompiledKG
+
+    def tag_mask(self, tags: Iterable[str]) -> Optional[np.ndarray]:
+        """Bitmask of ``tags`` split into uint64 lanes, or None if any tag is unknown."""
+        mask = 0
+        for tag in tags:
+            bit = self.tag_index.get(tag)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return _to_lanes(mask, self.tag_masks.shape[1])
+
+    def has_tags(self, row: int, tags: Iterable[str]) -> bool:
+        required = self.tag_mask(tags)
+        return required is not None and bool(((self.tag_masks[row] & required) == required).all())
+
+    def rows_with_tags(self, rows: np.ndarray, tags: Iterable[str]) -> np.ndarray:
+        """Boolean mask over ``rows`` of the products carrying every tag in ``tags``."""
+        required = self.tag_mask(tags)
+        if required is None:
+            return np.zeros(len(rows), dtype=bool)
+        return ((self.tag_masks[rows] & required) == required).all(axis=1)
+
+_LANE_BITS = (1 << 64) - 1
+
+def _to_lanes(mask: int, lanes: int) -> np.ndarray:
+    return np.array([(mask >> (64 * i)) & _LANE_BITS for i in range(lanes)], dtype=np.uint64)
+
+def _codes(values: List[str], order: List[str]) -> Dict[str, int]:
+    index = {v: i for i, v in enumerate(order)}
+    for v in sorted(set(values) - set(index)):
+        index[v] = len(index)
+    return index
+
+_get_id = attrgetter("product_id")
+_get_name = attrgetter("name")
+_get_price = attrgetter("price")
+_get_in_stock = attrgetter("in_stock")
+_get_category = attrgetter("category")
+_get_brand = attrgetter("brand")
+
+def build_catalog(products: List[Product], KG: Optional[nx.Graph] = None) -> Catalog:
+    """Build the catalog; ``KG`` may be passed in when a prebuilt graph is at hand."""
+    n = len(products)
+    # Column pulls go through map(attrgetter) so the attribute loop runs in C.
+    ids = list(map(_get_id, products))
+    categories = list(map(_get_category, products))
+    brands = list(map(_get_brand, products))
+
+    # Categories and brands are compared as small integer codes.
+    category_index = _codes(categories, CATEGORIES)
+    brand_index = _codes(brands, [])
+    # closeness[source, target]: 1.0 same category, 0.7 similar, 0.0 otherwise.
+    # float64 so scores come out bit-identical to the scalar arithmetic.
+    closeness = np.zeros((len(category_index), len(category_index)), dtype=np.float64)
+    for src, targets in SIMILAR_CATEGORIES.items():
+        for t in targets:
+            if src in category_index and t in category_index:
+                closeness[category_index[src], category_index[t]] = 0.7
+    np.fill_diagonal(closeness, 1.0)
+
+    all_tags = sorted({tag for p in products for tag in p.tags})
+    tag_index = {tag: i for i, tag in enumerate(all_tags)}
+    # One uint64 lane holds 64 tags; larger vocabularies spill into more lanes.
+    lanes = max(1, -(-len(all_tags) // 64))
+
+    masks = []
+    for p in products:
+        mask = 0
+        for tag in p.tags:
+            mask |= 1 << tag_index[tag]
+        masks.append(_to_lanes(mask, lanes))
+
+    if KG is None:
+        KG = build_kg(products)
+
+    return Catalog(
+        products=products,
+        id_to_product=dict(zip(ids, products)),
+        name_to_product_id=dict(zip(map(_get_name, products), ids)),
+        row_of={pid: i for i, pid in enumerate(ids)},
+        prices=np.fromiter(map(_get_price, products), dtype=np.float64, count=n),
+        in_stock=np.fromiter(map(_get_in_stock, products), dtype=bool, count=n),
+        category_index=category_index,
+        category_codes=np.fromiter(map(category_index.__getitem__, categories), dtype=np.int16, count=n),
+        category_closeness=closeness,
+        brand_index=brand_index,
+        brand_codes=np.fromiter(map(brand_index.__getitem__, brands), dtype=np.int32, count=n),
+        tag_index=tag_index,
+        tag_masks=np.array(masks, dtype=np.uint64).reshape(n, lanes),
+        KG=KG,
+        compiled_kg=compile_kg(KG, products),
+    )
@@ -1,7 +1,10 @@
+from dataclasses import dataclass
+from operator import attrgetter
 from typing import List, Dict
 import networkx as nx
+import numpy as np
 from src.models.product import Product
-from src.utils.logger import logger
+from src.utils.logger import logger, INFO_ENABLED
 
 CATEGORIES = ["Dairy", "Bakery", "Snacks", "Beverages", "Health"]
 
@@ -28,8 +31,12 @@ def build_kg(products: List[Product]) -> nx.Graph:
         KG.add_node(f"category:{cat}", node_type="category", name=cat)
 
     # Brands and attributes
-    brands = sorted({p.brand for p in products})
-    attributes = sorted({tag for p in products for tag in p.tags})
+    brand_set, tag_set = set(), set()
+    for p in products:
+        brand_set.add(p.brand)
+        tag_set.update(p.tags)
+    brands = sorted(brand_set)
+    attributes = sorted(tag_set)
 
     for brand in brands:
         KG.add_node(f"brand:{brand}", node_type="brand", name=brand)
@@ -57,10 +64,51 @@ def build_kg(products: List[Product]) -> nx.Graph:
             KG.add_edge(pid, f"attr:{tag}", edge_type="HAS_ATTRIBUTE")
 
     # SIMILAR_TO edges
-    product_ids = {p.product_id for p in products}
+    product_ids = set(map(attrgetter("product_id"), products))
     for a, b in SIMILAR_PAIRS:
         if a in product_ids and b in product_ids:
             KG.add_edge(f"product:{a}", f"product:{b}", edge_type="SIMILAR_TO")
 
-    logger.info(f"KG built: {KG.number_of_nodes()} nodes, {KG.number_of_edges()} edges")
+    if INFO_ENABLED:
+        logger.info("KG built: %d nodes, %d edges", KG.number_of_nodes(), KG.number_of_edges())
     return KG
+
+@dataclass
+class CompiledKG:
+    """Integer CSR copy of the KG adjacency used by the candidate search.
+
+    Node ``i`` is the i-th node of the NetworkX graph; its neighbours are
+    ``indices[indptr[i]:indptr[i + 1]]`` in NetworkX iteration order.
+    ``product_row[i]`` is the product's position in the product list, or -1
+    for category, brand and attribute nodes. ``adjacency`` and
+    ``product_rows`` hold the same data as plain Python lists, which
+    interpreted loops iterate much faster than NumPy scalars.
+    """
+
+    node_index: Dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    product_row: np.ndarray
+    adjacency: List[List[int]]
+    product_rows: List[int]
+
+def compile_kg(KG: nx.Graph, products: List[Product]) -> CompiledKG:
+    node_index = {node: i for i, node in enumerate(KG.nodes)}
+    row_of = {p.product_id: i for i, p in enumerate(products)}
+
+    indptr = [0]
+    indices: List[int] = []
+    product_row = []
+    for node, attrs in KG.nodes(data=True):
+        indices.extend(node_index[nb] for nb in KG.adj[node])
+        indptr.append(len(indices))
+        product_row.append(row_of[attrs["product_id"]] if attrs["node_type"] == "product" else -1)
+
+    return CompiledKG(
+        node_index=node_index,
+        indptr=np.array(indptr, dtype=np.int32),
+        indices=np.array(indices, dtype=np.int32),
+        product_row=np.array(product_row, dtype=np.int32),
+        adjacency=[indices[indptr[i]:indptr[i + 1]] for i in range(len(product_row))],
+        product_rows=product_row,
+    )
@@ -1,26 +1,27 @@
 from typing import List, Dict, Any, Optional, Tuple
 from collections import deque
-import networkx as nx
+from functools import lru_cache
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional accelerator; the pure-Python BFS is used instead
+    njit = None
 
 from src.models.product import Product, Recommendation
-from src.core.kg_builder import SIMILAR_CATEGORIES
-from src.utils.logger import logger
+from src.core.catalog import Catalog
+from src.core.kg_builder import CompiledKG
+from src.utils.logger import logger, INFO_ENABLED
+
+PRODUCT_NODE_PREFIX = "product:"
 
 def product_to_node_id(product_id: str) -> str:
-    return f"product:{product_id}"
+    return f"{PRODUCT_NODE_PREFIX}{product_id}"
 
 def node_id_to_product(node_id: str, id_to_product: Dict[str, Product]) -> Optional[Product]:
-    if not node_id.startswith("product:"):
+    if not node_id.startswith(PRODUCT_NODE_PREFIX):
         return None
-    pid = node_id.split("product:")[-1]
-    return id_to_product.get(pid)
-
-def category_closeness(source_cat: str, target_cat: str) -> float:
-    if source_cat == target_cat:
-        return 1.0
-    if target_cat in SIMILAR_CATEGORIES.get(source_cat, []):
-        return 0.7
-    return 0.0
+    return id_to_product.get(node_id[len(PRODUCT_NODE_PREFIX):])
 
 RULE_EXPLANATIONS = {
     "exact_match_available": "The exact item is in stock and matches your filters.",
@@ -36,25 +37,32 @@ RULE_EXPLANATIONS = {
     "closer_in_graph": "Close to the requested item in the knowledge graph.",
 }
 
-def build_explanation(rule_tags: List[str], required_tags: List[str]) -> str:
+@lru_cache(maxsize=256)
+def _explain(rule_tags: Tuple[str, ...], required_tags: Tuple[str, ...]) -> str:
     parts = [RULE_EXPLANATIONS[t] for t in rule_tags if t in RULE_EXPLANATIONS]
     if required_tags and "all_required_tags_matched" in rule_tags:
         parts.append("Required tags: " + ", ".join(required_tags) + ".")
     return " ".join(parts).strip()
 
+def build_explanation(rule_tags: List[str], required_tags: List[str]) -> str:
+    # Only a few dozen rule-tag combinations exist, so the text is memoized.
+    # Tuples rather than frozensets: tag order sets the sentence order.
+    return _explain(tuple(rule_tags), tuple(required_tags))
+
 def check_exact_product_availability(
+    catalog: Catalog,
     product: Product,
     max_price: Optional[float],
     required_tags: List[str],
     preferred_brand: Optional[str] = None,
 ) -> Tuple[Optional[Product], List[str]]:
-    if preferred_brand is not None and product.brand != preferred_brand:
-        return None, []
-    if max_price is not None and product.price > max_price:
-        return None, []
-    if not product.in_stock:
-        return None, []
-    if not set(required_tags).issubset(set(product.tags)):
+    # Cheapest checks first; the tag mask is only built when tags are required.
+    if (
+        not product.in_stock
+        or (max_price is not None and product.price > max_price)
+        or (preferred_brand is not None and product.brand != preferred_brand)
+        or (required_tags and not catalog.has_tags(catalog.row_of[product.product_id], required_tags))
+    ):
         return None, []
     tags = ["exact_match_available"]
     if preferred_brand is not None:
@@ -63,108 +71,214 @@ def check_exact_product_availability(
         tags.append("all_required_tags_matched")
     return product, tags
 
-def bfs_candidates_with_depth(
-    KG: nx.Graph,
-    requested: Product,
-    id_to_product: Dict[str, Product],
-    max_depth: int = 2,
-) -> Tuple[Dict[str, Tuple[Product,int]], int]:
-    start = product_to_node_id(requested.product_id)
-    visited = {start}
+def _bfs_adjacency(
+    adjacency: List[List[int]],
+    product_row: List[int],
+    start: int,
+    max_depth: int,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    visited = bytearray(len(product_row))
+    visited[start] = 1
     queue = deque([(start, 0)])
     traversed = 0
-    candidates: Dict[str, Tuple[Product,int]] = {}
+    rows: List[int] = []
+    depths: List[int] = []
 
     while queue:
         node, depth = queue.popleft()
         traversed += 1
         if depth >= max_depth:
             continue
-        for nb in KG.neighbors(node):
-            if nb in visited:
+        for nb in adjacency[node]:
+            if visited[nb]:
                 continue
-            visited.add(nb)
+            visited[nb] = 1
             queue.append((nb, depth + 1))
-            if nb.startswith("product:") and nb != start:
-                p = node_id_to_product(nb, id_to_product)
-                if p:
-                    prev = candidates.get(p.product_id)
-                    if prev is None or depth + 1 < prev[1]:
-                        candidates[p.product_id] = (p, depth + 1)
+            # BFS reaches every node first at its minimum depth.
+            row = product_row[nb]
+            if row >= 0:
+                rows.append(row)
+                depths.append(depth + 1)
+
+    return np.array(rows, dtype=np.intp), np.array(depths, dtype=np.int64), traversed
+
+def _bfs_csr(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    product_row: np.ndarray,
+    start: int,
+    max_depth: int,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    # Same traversal as _bfs_adjacency, written against fixed-size arrays so
+    # Numba can compile it. Every node is enqueued at most once, so a plain
+    # array of size N serves as the queue.
+    n = product_row.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    queue = np.empty(n, dtype=np.int32)
+    queue_depth = np.empty(n, dtype=np.int32)
+    rows = np.empty(n, dtype=np.intp)
+    depths = np.empty(n, dtype=np.int64)
+
+    visited[start] = True
+    queue[0] = start
+    queue_depth[0] = 0
+    head, tail, found = 0, 1, 0
+    while head < tail:
+        node = queue[head]
+        depth = queue_depth[head]
+        head += 1
+        if depth >= max_depth:
+            continue
+        for k in range(indptr[node], indptr[node + 1]):
+            nb = indices[k]
+            if visited[nb]:
+                continue
+            visited[nb] = True
+            queue[tail] = nb
+            queue_depth[tail] = depth + 1
+            tail += 1
+            row = product_row[nb]
+            if row >= 0:
+                rows[found] = row
+                depths[found] = depth + 1
+                found += 1
+
+    return rows[:found], depths[:found], head
+
+if njit is not None:
+    try:
+        _bfs_csr = njit(cache=True)(_bfs_csr)
+    except RuntimeError:
+        # No writable cache location (read-only install, no home directory):
+        # compile per process instead of failing the import.
+        _bfs_csr = njit(_bfs_csr)
+
+def bfs_candidates_with_depth(
+    ckg: CompiledKG,
+    requested: Product,
+    max_depth: int = 2,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Bounded BFS from ``requested`` over the integer CSR adjacency ``ckg``.
+
+    Returns the catalog rows of the products found (in discovery order), the
+    depth at which each was first reached and the number of nodes traversed.
+    Uses the Numba-compiled kernel when Numba is installed.
+    """
+    start = ckg.node_index[product_to_node_id(requested.product_id)]
+    if njit is not None:
+        rows, depths, traversed = _bfs_csr(ckg.indptr, ckg.indices, ckg.product_row, start, max_depth)
+        traversed = int(traversed)
+    else:
+        rows, depths, traversed = _bfs_adjacency(ckg.adjacency, ckg.product_rows, start, max_depth)
 
-    logger.info(f"BFS traversed {traversed} nodes, found {len(candidates)} candidate products")
-    return candidates, traversed
+    if INFO_ENABLED:
+        logger.info("BFS traversed %d nodes, found %d candidate products", traversed, len(rows))
+    return rows, depths, traversed
 
-def score_candidate(
+def score_candidates(
+    catalog: Catalog,
     requested: Product,
-    candidate: Product,
-    depth: int,
+    rows: np.ndarray,
+    depths: np.ndarray,
     max_price: Optional[float],
     required_tags: List[str],
     preferred_brand: Optional[str],
-) -> Tuple[Optional[float], List[str]]:
-    rule_tags: List[str] = []
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Filter and score candidate catalog rows with whole-array operations.
 
-    if not candidate.in_stock:
-        return None, []
-    if max_price is not None and candidate.price > max_price:
-        return None, []
-    if not set(required_tags).issubset(set(candidate.tags)):
-        return None, []
+    Returns the surviving rows, their scores and the per-row boolean flags
+    that ``candidate_rule_tags`` turns into rule tags.
+    """
+    valid = catalog.in_stock[rows]
+    if max_price is not None:
+        valid &= catalog.prices[rows] <= max_price
+    if required_tags:
+        valid &= catalog.rows_with_tags(rows, required_tags)
+    rows, depths = rows[valid], depths[valid]
 
-    score = 0.0
-
-    cat_score = category_closeness(requested.category, candidate.category)
-    score += cat_score * 4.0
-    if cat_score == 1.0:
-        rule_tags.append("same_category")
-    elif cat_score > 0:
-        rule_tags.append("similar_category")
+    req_cat = catalog.category_index[requested.category]
+    categories = catalog.category_codes[rows]
+    cat_score = catalog.category_closeness[req_cat, categories]
+    same_category = categories == req_cat
+    similar_category = ~same_category & (cat_score > 0.0)
 
+    brands = catalog.brand_codes[rows]
     if preferred_brand is not None:
-        if candidate.brand == preferred_brand:
-            score += 3.0
-            rule_tags.append("preferred_brand_respected")
-        else:
-            score -= 0.5
-            rule_tags.append("different_brand_than_requested")
+        brand_match = brands == catalog.brand_index.get(preferred_brand, -1)
+        brand_score = np.where(brand_match, 3.0, -0.5)
     else:
-        if candidate.brand == requested.brand:
-            score += 2.0
-            rule_tags.append("same_brand_as_requested")
-        else:
-            rule_tags.append("different_brand_than_requested")
+        brand_match = brands == catalog.brand_index[requested.brand]
+        brand_score = np.where(brand_match, 2.0, 0.0)
+
+    prices = catalog.prices[rows]
+    cheaper = prices < requested.price
+    same_price = prices == requested.price
+    price_score = np.select([cheaper, same_price], [1.0, 0.5], default=-0.2)
+
+    depth_score = np.maximum(0, 3 - depths) * 0.5
+
+    scores = cat_score * 4.0 + brand_score + price_score + depth_score
+    flags = {
+        "same_category": same_category,
+        "similar_category": similar_category,
+        "brand_match": brand_match,
+        "cheaper": cheaper,
+        "same_price": same_price,
+    }
+    return rows, scores, flags
 
-    if candidate.price < requested.price:
-        score += 1.0
+def candidate_rule_tags(
+    flags: Dict[str, np.ndarray],
+    i: int,
+    required_tags: List[str],
+    preferred_brand: Optional[str],
+) -> List[str]:
+    rule_tags: List[str] = []
+    if flags["same_category"][i]:
+        rule_tags.append("same_category")
+    elif flags["similar_category"][i]:
+        rule_tags.append("similar_category")
+    if not flags["brand_match"][i]:
+        rule_tags.append("different_brand_than_requested")
+    elif preferred_brand is not None:
+        rule_tags.append("preferred_brand_respected")
+    else:
+        rule_tags.append("same_brand_as_requested")
+    if flags["cheaper"][i]:
         rule_tags.append("cheaper_option")
-    elif candidate.price == requested.price:
-        score += 0.5
+    elif flags["same_price"][i]:
         rule_tags.append("same_price_as_requested")
     else:
-        score -= 0.2
         rule_tags.append("slightly_more_expensive")
-
-    score += max(0, (3 - depth)) * 0.5
     rule_tags.append("closer_in_graph")
-
     if required_tags:
         rule_tags.append("all_required_tags_matched")
+    return rule_tags
 
-    return score, rule_tags
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first; equal scores keep input order."""
+    n = scores.size
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # O(n) selection of the k-th largest score instead of a full sort.
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - above.size]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
 
 def find_alternatives(
-    KG: nx.Graph,
-    products: List[Product],
+    catalog: Catalog,
     requested_product_name: str,
     max_price: Optional[float],
     required_tags: List[str],
     preferred_brand: Optional[str],
     max_alternatives: int = 3,
 ) -> Dict[str, Any]:
-    id_to_product = {p.product_id: p for p in products}
-    name_to_product_id = {p.name: p.product_id for p in products}
-
     res: Dict[str, Any] = {
         "requested": None,
         "exact_match": None,
@@ -173,16 +287,16 @@ def find_alternatives(
         "traversed_nodes": 0,
     }
 
-    pid = name_to_product_id.get(requested_product_name)
+    pid = catalog.name_to_product_id.get(requested_product_name)
     if pid is None:
         res["message"] = "Product not found."
         return res
 
-    requested = id_to_product[pid]
+    requested = catalog.id_to_product[pid]
     res["requested"] = requested
 
     exact, exact_tags = check_exact_product_availability(
-        requested, max_price, required_tags, preferred_brand
+        catalog, requested, max_price, required_tags, preferred_brand
     )
     if exact is not None:
         res["exact_match"] = {
@@ -191,21 +305,23 @@ def find_alternatives(
             "explanation": build_explanation(exact_tags, required_tags),
         }
 
-    candidates_with_depth, traversed = bfs_candidates_with_depth(KG, requested, id_to_product, max_depth=2)
+    rows, depths, traversed = bfs_candidates_with_depth(catalog.compiled_kg, requested, max_depth=2)
     res["traversed_nodes"] = traversed
 
-    scored: List[Recommendation] = []
-    for _, (cand, depth) in candidates_with_depth.items():
-        s, tags = score_candidate(
-            requested, cand, depth, max_price, required_tags, preferred_brand
-        )
-        if s is None:
-            continue
-        expl = build_explanation(tags, required_tags)
-        scored.append(Recommendation(product=cand, score=s, rule_tags=tags, explanation=expl))
+    rows, scores, flags = score_candidates(
+        catalog, requested, rows, depths, max_price, required_tags, preferred_brand
+    )
 
-    scored.sort(key=lambda r: r.score, reverse=True)
-    top = scored[:max_alternatives]
+    # Rule tags and explanation text are only built for the winners.
+    top: List[Recommendation] = []
+    for i in top_k_indices(scores, max_alternatives):
+        tags = candidate_rule_tags(flags, i, required_tags, preferred_brand)
+        top.append(Recommendation(
+            product=catalog.products[rows[i]],
+            score=float(scores[i]),
+            rule_tags=tuple(tags),
+            explanation=build_explanation(tags, required_tags),
+        ))
 
     if not top:
         if exact is not None:
@@ -1,24 +1,32 @@
-from typing import List, Optional
-import matplotlib.pyplot as plt
+from typing import Dict, List, Optional
+from matplotlib.figure import Figure
 import networkx as nx
 
-from src.models.product import Product, Recommendation
+from src.models.product import Product
 from src.core.reasoning import product_to_node_id
 
-def visualize_search_path(KG: nx.Graph, root_product: Product, recs: List[Recommendation]) -> Optional[plt.Figure]:
-    if not recs:
+def _paths_from(KG: nx.Graph, root_id: str) -> Dict[str, List[str]]:
+    # One BFS per requested product, memoized on the graph, instead of a BFS
+    # per drawn target; the KG never changes after it is built.
+    memo = KG.graph.setdefault("paths_from", {})
+    if root_id not in memo:
+        memo[root_id] = nx.single_source_shortest_path(KG, root_id) if root_id in KG else {}
+    return memo[root_id]
+
+def visualize_search_path(KG: nx.Graph, root_product: Product, targets: List[Product]) -> Optional[Figure]:
+    if not targets:
         return None
 
     root_id = product_to_node_id(root_product.product_id)
-    target_ids = [product_to_node_id(r.product.product_id) for r in recs]
+    target_ids = [product_to_node_id(t.product_id) for t in targets]
 
     nodes = {root_id}
     edges = set()
 
+    paths = _paths_from(KG, root_id)
     for tid in target_ids:
-        try:
-            path = nx.shortest_path(KG, source=root_id, target=tid)
-        except nx.NetworkXNoPath:
+        path = paths.get(tid)
+        if path is None:
             continue
         for i in range(len(path) - 1):
             a, b = path[i], path[i + 1]
@@ -28,12 +36,22 @@ def visualize_search_path(KG: nx.Graph, root_product: Product, recs: List[Recomm
     if not edges:
         return None
 
-    sub = KG.edge_subgraph(list(edges)).copy()
+    # A fresh graph carrying only the two attributes drawn below, rather than
+    # a copy of the KG subgraph with every product attribute.
+    sub = nx.Graph()
+    for n in nodes:
+        attrs = KG.nodes[n]
+        sub.add_node(n, node_type=attrs.get("node_type"), name=attrs.get("name", n))
+    sub.add_edges_from(edges)
+    target_set = set(target_ids)
 
-    plt.figure(figsize=(10, 6))
+    # A standalone Figure (not pyplot) so it can be cached and is never left
+    # open in pyplot's global figure registry.
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
     shells = [
         [root_id],
-        [n for n in nodes if n not in [root_id] + target_ids],
+        [n for n in nodes if n != root_id and n not in target_set],
         target_ids,
     ]
     pos = nx.shell_layout(sub, nlist=shells)
@@ -42,7 +60,7 @@ def visualize_search_path(KG: nx.Graph, root_product: Product, recs: List[Recomm
     for n in sub.nodes():
         if n == root_id:
             colors.append("#ffe680")   # requested
-        elif n in target_ids:
+        elif n in target_set:
             colors.append("#b3ffb3")   # alternatives
         else:
             t = sub.nodes[n].get("node_type")
@@ -55,14 +73,13 @@ def visualize_search_path(KG: nx.Graph, root_product: Product, recs: List[Recomm
             else:
                 colors.append("#f0f0f0")
 
-    nx.draw_networkx_nodes(sub, pos, node_size=650, node_color=colors, edgecolors="#000000")
-    nx.draw_networkx_edges(sub, pos, alpha=0.7, width=1.5, edge_color="#bbbbbb")
+    nx.draw_networkx_nodes(sub, pos, node_size=650, node_color=colors, edgecolors="#000000", ax=ax)
+    nx.draw_networkx_edges(sub, pos, alpha=0.7, width=1.5, edge_color="#bbbbbb", ax=ax)
 
     labels = {n: sub.nodes[n].get("name", n) for n in sub.nodes()}
-    nx.draw_networkx_labels(sub, pos, labels=labels, font_size=8, font_color="#000000")
+    nx.draw_networkx_labels(sub, pos, labels=labels, font_size=8, font_color="#000000", ax=ax)
 
-    ax = plt.gca()
     ax.set_facecolor("#050b16")
-    plt.title(f"Paths from '{root_product.name}' to recommended items", fontsize=10, color="#ffffff")
-    plt.axis("off")
-    return plt
+    ax.set_title(f"Paths from '{root_product.name}' to recommended items", fontsize=10, color="#ffffff")
+    ax.axis("off")
+    return fig
@@ -1,31 +1,242 @@
 import json
-from typing import List, Dict, Any
-from src.config.paths import PRODUCTS_PATH, CATEGORIES_PATH, ATTRIBUTES_PATH
-from src.models.product import Product
+import mmap
+import os
+import pickle
+from dataclasses import fields
+from typing import List, Dict, Any, BinaryIO, Callable, Hashable, Iterator, Optional, Tuple
+from src.config.paths import (
+    PRODUCTS_PATH, PRODUCTS_NDJSON_PATH, CATEGORIES_PATH, ATTRIBUTES_PATH, CACHE_DIR,
+)
+from src.models.product import Product, PRODUCT_SCHEMA
 from src.utils.exceptions import DataLoadError
-from src.utils.logger import logger
+from src.utils.logger import logger, INFO_ENABLED
 
-def _load_json(path: str) -> Any:
+try:
+    from orjson import loads as _loads
+    _LOADS_TAKES_BUFFER = True
+except ImportError:  # optional; stdlib json parses the same files, only slower
+    from json import loads as _loads
+    _LOADS_TAKES_BUFFER = False
+
+try:
+    import simdjson
+except ImportError:  # optional; _load_json_lazy falls back to a full parse
+    simdjson = None
+
+def _has_schema_type(value: Any, spec: Dict[str, Any]) -> bool:
+    kind = spec["type"]
+    if kind == "string":
+        return isinstance(value, str)
+    if kind == "number":
+        # JSON numbers; bool subclasses int but is not a number here.
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == "boolean":
+        return isinstance(value, bool)
+    if kind == "array":
+        return isinstance(value, list) and all(_has_schema_type(v, spec["items"]) for v in value)
+    raise ValueError(f"unsupported schema type: {kind}")
+
+def _check_product_record(item: Any) -> None:
+    # Fallback for PRODUCT_SCHEMA without fastjsonschema: required and allowed
+    # keys plus the "type" of every property the schema declares.
+    if not isinstance(item, dict):
+        raise ValueError("record must be an object")
+    missing = set(PRODUCT_SCHEMA["required"]) - item.keys()
+    if missing:
+        raise ValueError(f"missing keys: {', '.join(sorted(missing))}")
+    properties = PRODUCT_SCHEMA["properties"]
+    unknown = item.keys() - properties.keys()
+    if unknown:
+        raise ValueError(f"unknown keys: {', '.join(sorted(unknown))}")
+    for name, value in item.items():
+        if not _has_schema_type(value, properties[name]):
+            raise ValueError(f"{name} must be of type {properties[name]['type']}, got {value!r}")
+
+try:
+    import fastjsonschema
+    _validate_product = fastjsonschema.compile(PRODUCT_SCHEMA)
+except ImportError:  # optional; falls back to a hand-written check of the same schema
+    _validate_product = _check_product_record
+
+def _parse_mapped(f: BinaryIO, parse: Callable[[Any], Any]) -> Any:
+    # Hand the parser a view of the page cache instead of a bytes copy.
+    # Empty files cannot be mapped; they go to the parser as-is and fail there.
+    if os.fstat(f.fileno()).st_size == 0:
+        return parse(b"")
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            return parse(view)
+        finally:
+            view.release()
+
+def _parse_file(path: str, parse: Callable[[Any], Any], mapped: bool = False) -> Any:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Unbuffered: the file is read whole (or mapped), so a Python-side
+        # buffer would only add a copy.
+        with open(path, "rb", buffering=0) as f:
+            return _parse_mapped(f, parse) if mapped else parse(f.readall())
     except FileNotFoundError as e:
-        logger.error(f"File not found: {path}")
+        logger.error("File not found: %s", path)
         raise DataLoadError(f"File not found: {path}") from e
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {path}")
+    except OSError as e:
+        logger.error("Could not read %s: %s", path, e)
+        raise DataLoadError(f"Could not read {path}: {e}") from e
+    # orjson, json and pysimdjson all report malformed input as a ValueError.
+    except ValueError as e:
+        logger.error("Invalid JSON in %s", path)
         raise DataLoadError(f"Invalid JSON in {path}") from e
 
+def _load_json(path: str) -> Any:
+    # orjson parses straight from a memory map; stdlib json needs bytes.
+    return _parse_file(path, _loads, mapped=_LOADS_TAKES_BUFFER)
+
+def _load_json_lazy(path: str) -> Any:
+    """Parse ``path`` with pysimdjson, whose values become Python objects only when read.
+
+    Each call gets its own parser, since reusing a parser invalidates the
+    previous document. Without pysimdjson this is a plain full parse.
+    """
+    if simdjson is None:
+        return _load_json(path)
+    return _parse_file(path, simdjson.Parser().parse)
+
+def _source_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _cached_load(
+    path: str, builder: Callable[[], Any], key: Hashable = None, name: Optional[str] = None,
+) -> Any:
+    """``builder()``, served from a pickle snapshot in CACHE_DIR while ``path`` is unchanged.
+
+    The snapshot records the source's exact (mtime_ns, size) alongside ``key``,
+    which describes the shape of the built value (e.g. the field names of the
+    classes in it). Any difference in either rebuilds it; in particular a
+    source replaced by an older file (``cp -p``, ``rsync -a``, a restore) is
+    not mistaken for fresh. ``name`` is the snapshot's file name, by default
+    the source's. Snapshot failures are logged and fall back to calling
+    ``builder``.
+    """
+    cache_path = os.path.join(CACHE_DIR, name or os.path.basename(path) + ".pkl")
+    stamp = _source_stamp(path)
+    if stamp is not None:
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, value = pickle.load(f)
+            if cached_key == (stamp, key):
+                return value
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.warning("Ignoring unreadable snapshot %s: %s", cache_path, e)
+
+    value = builder()
+    if stamp is None:
+        return value
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(((stamp, key), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning("Could not write snapshot %s: %s", cache_path, e)
+    return value
+
+def _validated(item: Any, where: str, path: str) -> Any:
+    try:
+        _validate_product(item)
+    # fastjsonschema.JsonSchemaException subclasses ValueError.
+    except ValueError as e:
+        logger.error("Invalid product at %s in %s: %s", where, path, e)
+        raise DataLoadError(f"Invalid product at {where} in {path}: {e}") from e
+    return item
+
+def _load_product_records(path: str) -> List[Dict[str, Any]]:
+    raw = _load_json(path)
+    if not isinstance(raw, list):
+        raise DataLoadError(f"Expected a list of products in {path}")
+    for i, item in enumerate(raw):
+        _validated(item, f"index {i}", path)
+    return raw
+
+def _build_products() -> List[Product]:
+    return [Product.from_json(item) for item in _load_product_records(PRODUCTS_PATH)]
+
+def load_products_stream(path: str = PRODUCTS_NDJSON_PATH) -> Iterator[Product]:
+    """Yield products from an NDJSON file (one record per line) as they are parsed.
+
+    Only one raw record is held at a time, so a caller that consumes products
+    one by one stays bounded. ``load_products`` still collects them all into
+    the catalog list, so there this is just the reader for the NDJSON format.
+    """
+    try:
+        with open(path, "rb") as f:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = _loads(line)
+                except ValueError as e:
+                    logger.error("Invalid JSON at line %d in %s", lineno, path)
+                    raise DataLoadError(f"Invalid JSON at line {lineno} in {path}") from e
+                yield Product.from_json(_validated(item, f"line {lineno}", path))
+    except FileNotFoundError as e:
+        logger.error("File not found: %s", path)
+        raise DataLoadError(f"File not found: {path}") from e
+    except OSError as e:
+        logger.error("Could not read %s: %s", path, e)
+        raise DataLoadError(f"Could not read {path}: {e}") from e
+
+def products_source() -> str:
+    # products.json stays the source of truth; large catalogs can ship as
+    # NDJSON instead of it, which is then streamed.
+    if not os.path.exists(PRODUCTS_PATH) and os.path.exists(PRODUCTS_NDJSON_PATH):
+        return PRODUCTS_NDJSON_PATH
+    return PRODUCTS_PATH
+
 def load_products() -> List[Product]:
-    raw = _load_json(PRODUCTS_PATH)
-    products = [Product(**item) for item in raw]
-    logger.info(f"Loaded {len(products)} products from {PRODUCTS_PATH}")
+    source = products_source()
+    if source == PRODUCTS_NDJSON_PATH:
+        builder: Callable[[], List[Product]] = lambda: list(load_products_stream())
+    else:
+        builder = _build_products
+    # Pickle keeps shared strings shared, so the interned values stay one
+    # object per value after a snapshot load too.
+    products = _cached_load(source, builder, key=tuple(f.name for f in fields(Product)))
+    if INFO_ENABLED:
+        logger.info("Loaded %d products from %s", len(products), source)
     return products
 
+def convert_products_to_ndjson(src: str = PRODUCTS_PATH, dst: str = PRODUCTS_NDJSON_PATH) -> int:
+    """Rewrite the products JSON array at ``src`` as NDJSON at ``dst``; returns the row count.
+
+    Records are validated as in ``load_products`` first, so a bad source
+    raises DataLoadError and leaves ``dst`` untouched.
+    """
+    raw = _load_product_records(src)
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for item in raw:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp_path, dst)
+    return len(raw)
+
 def load_categories() -> Dict[str, Any]:
     data = _load_json(CATEGORIES_PATH)
     return {item["name"]: item for item in data}
 
 def load_attributes() -> List[str]:
-    data = _load_json(ATTRIBUTES_PATH)
+    # Only "name" is read, so the rest of each record is never materialized.
+    data = _load_json_lazy(ATTRIBUTES_PATH)
     return [item["name"] for item in data]
+
+if __name__ == "__main__":
+    # One-off conversion: python -m src.data_access.loader
+    n = convert_products_to_ndjson()
+    print(f"Wrote {n} products to {PRODUCTS_NDJSON_PATH}")
@@ -1,7 +1,8 @@
-from dataclasses import dataclass, field
-from typing import List
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Product:
     product_id: str
     name: str
@@ -9,11 +10,46 @@ class Product:
     brand: str
     price: float
     in_stock: bool
-    tags: List[str] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
 
-@dataclass
+    @classmethod
+    def from_json(cls, item: Dict[str, Any]) -> "Product":
+        """Build from a products.json record, passing fields positionally.
+
+        Categories, brands and tags come from small closed vocabularies;
+        interning them shares one string object per value so equality checks
+        hit the identity fast path.
+        """
+        intern = sys.intern
+        return cls(
+            item["product_id"],
+            item["name"],
+            intern(item["category"]),
+            intern(item["brand"]),
+            item["price"],
+            item["in_stock"],
+            tuple(map(intern, item.get("tags", ()))),
+        )
+
+# JSON Schema of one record in products.json.
+PRODUCT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "product_id": {"type": "string"},
+        "name": {"type": "string"},
+        "category": {"type": "string"},
+        "brand": {"type": "string"},
+        "price": {"type": "number"},
+        "in_stock": {"type": "boolean"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["product_id", "name", "category", "brand", "price", "in_stock"],
+    "additionalProperties": False,
+}
+
+@dataclass(frozen=True, slots=True)
 class Recommendation:
     product: Product
     score: float
-    rule_tags: List[str]
+    rule_tags: Tuple[str, ...]
     explanation: str
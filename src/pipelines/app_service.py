@@ -1,24 +1,66 @@
-from typing import List, Dict, Any, Optional
-import networkx as nx
+import hashlib
+import os
+from dataclasses import fields
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Sequence, Tuple
 
+from src.core import kg_builder
 from src.models.product import Product
-from src.data_access.loader import load_products
-from src.core.kg_builder import build_kg
+from src.data_access.loader import _cached_load, load_products, products_source
+from src.core.catalog import Catalog, build_catalog
 from src.core.reasoning import find_alternatives
-from src.core.visualize import visualize_search_path
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+NO_BRAND_PREFERENCE = "(no preference)"
+
+def _load_kg(products: List[Product]) -> "nx.Graph":
+    """The KG for ``products``, from a snapshot kept next to the products snapshot.
+
+    Both are keyed on the same source stamp, so they are rebuilt together;
+    the builder's source is part of the key so code changes rebuild it too.
+    """
+    source = products_source()
+    with open(kg_builder.__file__, "rb") as f:
+        builder_digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    return _cached_load(
+        source,
+        lambda: kg_builder.build_kg(products),
+        key=(tuple(f.name for f in fields(Product)), builder_digest),
+        name=os.path.basename(source) + ".kg.pkl",
+    )
 
 class AppService:
     """High-level service used by Streamlit app."""
 
     def __init__(self) -> None:
         self.products: List[Product] = load_products()
-        self.KG: nx.Graph = build_kg(self.products)
+        # The catalog also owns the KG: the NetworkX graph for the
+        # visualization and the CSR copy the search runs on.
+        self.catalog: Catalog = build_catalog(self.products, _load_kg(self.products))
+        self.KG: "nx.Graph" = self.catalog.KG
+
+        # Widget vocabularies never change after load, so compute them once here
+        # instead of on every Streamlit rerun.
+        names_by_category: Dict[str, List[str]] = {}
+        for p in self.products:
+            names_by_category.setdefault(p.category, []).append(p.name)
+        # Tuples: immutable, and the same object is handed to the widgets on
+        # every rerun.
+        self._by_category: Dict[str, Tuple[str, ...]] = {
+            cat: tuple(sorted(names)) for cat, names in names_by_category.items()
+        }
+        self.categories: Tuple[str, ...] = tuple(sorted(self._by_category))
+        # The catalog's tag and brand indexes are already sorted vocabularies.
+        self.all_tags: Tuple[str, ...] = tuple(self.catalog.tag_index)
+        self.all_brands: Tuple[str, ...] = tuple(self.catalog.brand_index)
+        self.brand_options: Tuple[str, ...] = (NO_BRAND_PREFERENCE,) + self.all_brands
 
-    def list_categories(self) -> List[str]:
-        return sorted({p.category for p in self.products})
+    def list_categories(self) -> Tuple[str, ...]:
+        return self.categories
 
-    def list_products_in_category(self, category: str) -> List[str]:
-        return sorted([p.name for p in self.products if p.category == category])
+    def list_products_in_category(self, category: str) -> Tuple[str, ...]:
+        return self._by_category.get(category, ())
 
     def get_results(
         self,
@@ -28,13 +70,15 @@ class AppService:
         preferred_brand: Optional[str],
     ) -> Dict[str, Any]:
         return find_alternatives(
-            self.KG,
-            self.products,
+            self.catalog,
             product_name,
             max_price,
             required_tags,
             preferred_brand,
         )
 
-    def build_visualization(self, root_product, recs):
-        return visualize_search_path(self.KG, root_product, recs)
+    def build_visualization(self, root_product: Product, targets: Sequence[Product]):
+        # Imported here so matplotlib only loads once a graph is actually drawn.
+        from src.core.visualize import visualize_search_path
+
+        return visualize_search_path(self.KG, root_product, list(targets))
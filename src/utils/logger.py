@@ -4,9 +4,19 @@ import os
 LOG_LEVEL = os.environ.get("SHOPKEEPER_LOG_LEVEL", "INFO").upper()
 
 logger = logging.getLogger("shopkeeper")
-if not logger.handlers:
+# The sentinel lives on the logger itself, so a re-executed module (e.g. a
+# Streamlit reload) still sees that setup already happened.
+if not getattr(logger, "_shopkeeper_configured", False):
     logger.setLevel(LOG_LEVEL)
     ch = logging.StreamHandler()
+    ch.setLevel(LOG_LEVEL)
     fmt = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
     ch.setFormatter(fmt)
     logger.addHandler(ch)
+    # Our handler is the only output; don't also walk up to the root logger.
+    logger.propagate = False
+    logger._shopkeeper_configured = True
+
+# The level is fixed by SHOPKEEPER_LOG_LEVEL at startup, so hot paths can check
+# this flag instead of building a LogRecord that would only be dropped.
+INFO_ENABLED = logger.isEnabledFor(logging.INFO)